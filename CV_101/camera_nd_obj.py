@@ -1,6 +1,82 @@
+import math
+
 import numpy as np
+from matplotlib.colors import same_color
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+# Optional numba support, shared with scene_3d_viewer: HAVE_NUMBA tells whether
+# kernels are compiled, and njit falls back to a no-op decorator without numba
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional, fall back to NumPy
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function uncompiled"""
+        return lambda func: func
+
+@njit(cache=True)
+def _orthonormal_frame(pos, target, up_hint, out_dir, out_right, out_up):
+    """
+    Write the camera frame looking from pos at target into preallocated 3-vectors
+    
+    Uses scalar arithmetic only, so no temporary arrays are created. up_hint may
+    be the same array as out_up. All arguments are float32 arrays of shape (3,).
+    """
+    # Direction: normalized target - pos
+    dx = target[0] - pos[0]
+    dy = target[1] - pos[1]
+    dz = target[2] - pos[2]
+    inv = 1.0 / math.sqrt(dx*dx + dy*dy + dz*dz)
+    dx, dy, dz = dx*inv, dy*inv, dz*inv
+    
+    # Right: normalized direction x up_hint
+    hx, hy, hz = up_hint[0], up_hint[1], up_hint[2]
+    rx = dy*hz - dz*hy
+    ry = dz*hx - dx*hz
+    rz = dx*hy - dy*hx
+    inv = 1.0 / math.sqrt(rx*rx + ry*ry + rz*rz)
+    rx, ry, rz = rx*inv, ry*inv, rz*inv
+    
+    # Up: normalized right x direction
+    ux = ry*dz - rz*dy
+    uy = rz*dx - rx*dz
+    uz = rx*dy - ry*dx
+    inv = 1.0 / math.sqrt(ux*ux + uy*uy + uz*uz)
+    
+    out_dir[0], out_dir[1], out_dir[2] = dx, dy, dz
+    out_right[0], out_right[1], out_right[2] = rx, ry, rz
+    out_up[0], out_up[1], out_up[2] = ux*inv, uy*inv, uz*inv
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _rotate_grid(cx, sx, cy, sy, cz, sz, X, Y):
+    """Rotate (Rz @ Ry @ Rx) flat grid points lying in the local z=0 plane, shape (3, N)"""
+    # Only the first two columns of the rotation act on z=0 points
+    r00, r01 = cz*cy, cz*sy*sx - sz*cx
+    r10, r11 = sz*cy, sz*sy*sx + cz*cx
+    r20, r21 = -sy, cy*sx
+    
+    rotated = np.empty((3, X.shape[0]), dtype=X.dtype)
+    for i in prange(X.shape[0]):
+        rotated[0, i] = r00*X[i] + r01*Y[i]
+        rotated[1, i] = r10*X[i] + r11*Y[i]
+        rotated[2, i] = r20*X[i] + r21*Y[i]
+    return rotated
 
 class Camera:
+    # Frustum edges as pairs of vertex indices: apex to base, then the base loop
+    _edge_indices = np.array([
+        (0,1), (0,2), (0,3), (0,4),
+        (1,2), (2,3), (3,4), (4,1)
+    ], dtype=np.int32)
+    
+    # Base corners as coefficients of the (right, direction, up) basis
+    _corner_signs = np.array([
+        [-1, 1, -1], [1, 1, -1], [1, 1, 1], [-1, 1, 1]
+    ], dtype=np.float32)
+    
     def __init__(self, position=np.array([2, -4, 2]), up=np.array([0, 0, 1]), size=0.3):
         """
         Initialize camera parameters
@@ -10,12 +86,17 @@ class Camera:
             up (np.ndarray): Camera up vector
             size (float): Size of camera frustum
         """
-        self._position = position
-        self._up = up
+        self._position = np.array(position, dtype=np.float32)
+        self._up = np.array(up, dtype=np.float32)
         self._size = size
         self._direction = None
         self._right = None
-        self._vertices = None
+        self._vertices = np.empty((5, 3), dtype=np.float32)
+        
+        # Camera frame buffers, reused by every update
+        self._dir_buf = np.empty(3, dtype=np.float32)
+        self._right_buf = np.empty(3, dtype=np.float32)
+        self._up_buf = np.empty(3, dtype=np.float32)
         
     @property
     def position(self):
@@ -23,7 +104,7 @@ class Camera:
     
     @position.setter
     def position(self, value):
-        self._position = np.array(value)
+        self._position = np.array(value, dtype=np.float32)
         self._update_camera()
         
     @property
@@ -37,54 +118,48 @@ class Camera:
     
     def look_at(self, target):
         """Update camera direction to look at target"""
-        self._direction = target - self.position
-        self._direction = self._direction / np.linalg.norm(self._direction)
-        self._update_camera()
+        _orthonormal_frame(self._position, np.asarray(target, dtype=np.float32), self._up,
+                           self._dir_buf, self._right_buf, self._up_buf)
+        self._direction, self._right, self._up = self._dir_buf, self._right_buf, self._up_buf
+        self._update_vertices()
     
     def _update_camera(self):
         """Update camera coordinate system"""
         if self._direction is None:
             return
             
-        self._right = np.cross(self._direction, self._up)
-        self._right = self._right / np.linalg.norm(self._right)
-        self._up = np.cross(self._right, self._direction)
-        self._up = self._up / np.linalg.norm(self._up)
+        _orthonormal_frame(self._position, self._position + self._direction, self._up,
+                           self._dir_buf, self._right_buf, self._up_buf)
+        self._right, self._up = self._right_buf, self._up_buf
         
         self._update_vertices()
     
     def _update_vertices(self):
         """Calculate camera frustum vertices"""
-        self._vertices = np.array([
-            self.position,  # Apex
-            self.position + self.size * (-self._right + self._direction - self._up),
-            self.position + self.size * (self._right + self._direction - self._up),
-            self.position + self.size * (self._right + self._direction + self._up),
-            self.position + self.size * (-self._right + self._direction + self._up)
-        ])
+        basis = np.stack([self._right, self._direction, self._up])
+        self._vertices[0] = self.position  # Apex
+        self._vertices[1:] = self.position + self.size * (self._corner_signs @ basis)
     
     def draw(self, ax):
         """Draw camera frustum"""
-        if self._vertices is None:
+        if self._direction is None:
             return
             
-        # Draw edges from apex to base
-        for i in range(1, 5):
-            ax.plot3D([self._vertices[0][0], self._vertices[i][0]],
-                     [self._vertices[0][1], self._vertices[i][1]],
-                     [self._vertices[0][2], self._vertices[i][2]], 'g-')
-        
-        # Draw base
-        base_indices = [1, 2, 3, 4, 1]
-        ax.plot3D([self._vertices[i][0] for i in base_indices],
-                 [self._vertices[i][1] for i in base_indices],
-                 [self._vertices[i][2] for i in base_indices], 'g-')
+        # Draw edges from apex to base and the base
+        ax.add_collection3d(Line3DCollection(self._vertices[self._edge_indices],
+                                             colors='g'))
         
         # Draw camera position marker
         ax.scatter3D(self.position[0], self.position[1], self.position[2], 
                     c='green', marker='o')
 
 class Cube:
+    # Unit cube corners, in vertex index order
+    _UNIT_CORNERS = np.array([
+        [0,0,0], [1,0,0], [0,1,0], [1,1,0],
+        [0,0,1], [1,0,1], [0,1,1], [1,1,1]
+    ], dtype=np.float32)
+    
     def __init__(self, origin=np.array([0, 0, 0]), size=1):
         """
         Initialize cube parameters
@@ -93,10 +168,11 @@ class Cube:
             origin (np.ndarray): Origin point of cube
             size (float): Size of cube edges
         """
-        self._origin = np.array(origin)
+        self._origin = np.array(origin, dtype=np.float32)
         self._size = size
         self._vertices = None
-        self._edges = None
+        self._edge_indices = None
+        self._edge_segments = None
         self._update_geometry()
     
     @property
@@ -105,28 +181,18 @@ class Cube:
     
     def _update_geometry(self):
         """Update cube vertices and edges"""
-        o = self._origin
-        s = self._size
-        
-        # Create vertices
-        self._vertices = np.array([
-            o + [0,0,0], o + [s,0,0], o + [0,s,0], o + [s,s,0],
-            o + [0,0,s], o + [s,0,s], o + [0,s,s], o + [s,s,s]
-        ])
+        # Create vertices by scaling and shifting the unit cube
+        self._vertices = self._origin + self._size * Cube._UNIT_CORNERS
         
         # Define edges as pairs of vertex indices
         edge_indices = [
             (0,1), (0,2), (0,4), (1,3), (1,5), (2,3),
             (2,6), (4,5), (4,6), (7,3), (7,5), (7,6)
         ]
+        self._edge_indices = np.asarray(edge_indices, dtype=np.int32)
         
-        # Create edges using vertex coordinates
-        self._edges = []
-        for start_idx, end_idx in edge_indices:
-            self._edges.append([
-                self._vertices[start_idx],
-                self._vertices[end_idx]
-            ])
+        # Edge segments carved from the vertices, shape (12, 2, 3)
+        self._edge_segments = self._vertices[self._edge_indices]
     
     def draw(self, ax):
         """Draw cube"""
@@ -135,11 +201,7 @@ class Cube:
                     self._vertices[:, 2], c='blue', marker='o')
         
         # Draw edges
-        for edge in self._edges:
-            start, end = edge
-            ax.plot3D([start[0], end[0]],
-                     [start[1], end[1]],
-                     [start[2], end[2]], c='red')
+        ax.add_collection3d(Line3DCollection(self._edge_segments, colors='red'))
 
 class Plane:
     def __init__(self, center=[0,0,0], rotation=[0,0,0], scale=5, num_points=10):
@@ -152,11 +214,30 @@ class Plane:
             scale (float): Size of plane
             num_points (int): Resolution of plane grid
         """
-        self._center = np.array(center)
-        self._rotation = np.array(rotation)
+        self._center = np.array(center, dtype=np.float32)
+        self._rotation = np.array(rotation, dtype=np.float32)
         self._scale = scale
         self._num_points = num_points
         self._surface = None
+        # Drawn surfaces per axes: (artist, color, alpha, rotation version)
+        self._surface_artists = {}
+        self._rotation_version = 0
+        
+        # Grid indices of the surface quad corners, sampled like ax.plot_surface
+        # does by default (at most 50 samples per direction)
+        self._surface_stride = max(int(np.ceil(num_points / 50)), 1)
+        self._surface_indices = np.r_[np.arange(0, num_points - 1, self._surface_stride),
+                                      num_points - 1]
+        
+        # Grid points in local plane coordinates, independent of center and rotation
+        x_plane = np.linspace(-self._scale, self._scale, self._num_points, dtype=np.float32)
+        y_plane = np.linspace(-self._scale, self._scale, self._num_points, dtype=np.float32)
+        X_plane, Y_plane = np.meshgrid(x_plane, y_plane)
+        Z_plane = np.zeros_like(X_plane)
+        self._local_points = np.stack([X_plane.ravel(), Y_plane.ravel(), Z_plane.ravel()])
+        self._rotated_points = None
+        
+        self._update_rotation()
         self._update_geometry()
     
     @property
@@ -165,7 +246,7 @@ class Plane:
     
     @center.setter
     def center(self, value):
-        self._center = np.array(value)
+        self._center = np.array(value, dtype=np.float32)
         self._update_geometry()
     
     @property
@@ -174,43 +255,34 @@ class Plane:
     
     @rotation.setter
     def rotation(self, value):
-        self._rotation = np.array(value)
+        self._rotation = np.array(value, dtype=np.float32)
+        self._update_rotation()
         self._update_geometry()
-    
-    def _update_geometry(self):
-        """Update plane geometry"""
-        x_plane = np.linspace(-self._scale, self._scale, self._num_points)
-        y_plane = np.linspace(-self._scale, self._scale, self._num_points)
-        X_plane, Y_plane = np.meshgrid(x_plane, y_plane)
-        Z_plane = np.zeros_like(X_plane)
         
-        points = np.stack([X_plane.flatten(), Y_plane.flatten(), 
-                          Z_plane.flatten(), np.ones_like(X_plane.flatten())])
-        
-        # Create transformation matrices
+        # Drawn surfaces' shading depends on their normals, so redraw them in full
+        self._rotation_version += 1
+    
+    def _update_rotation(self):
+        """Rotate the cached local grid points"""
         rx, ry, rz = np.radians(self._rotation)
-        Rx = np.array([[1, 0, 0, 0],
-                      [0, np.cos(rx), -np.sin(rx), 0],
-                      [0, np.sin(rx), np.cos(rx), 0],
-                      [0, 0, 0, 1]])
+        cx, sx = np.cos(rx), np.sin(rx)
+        cy, sy = np.cos(ry), np.sin(ry)
+        cz, sz = np.cos(rz), np.sin(rz)
         
-        Ry = np.array([[np.cos(ry), 0, np.sin(ry), 0],
-                      [0, 1, 0, 0],
-                      [-np.sin(ry), 0, np.cos(ry), 0],
-                      [0, 0, 0, 1]])
-        
-        Rz = np.array([[np.cos(rz), -np.sin(rz), 0, 0],
-                      [np.sin(rz), np.cos(rz), 0, 0],
-                      [0, 0, 1, 0],
-                      [0, 0, 0, 1]])
-        
-        T = np.array([[1, 0, 0, self._center[0]],
-                     [0, 1, 0, self._center[1]],
-                     [0, 0, 1, self._center[2]],
-                     [0, 0, 0, 1]])
+        if HAVE_NUMBA:
+            self._rotated_points = _rotate_grid(cx, sx, cy, sy, cz, sz,
+                                                self._local_points[0], self._local_points[1])
+            return
         
-        transform = T @ Rz @ Ry @ Rx
-        transformed = transform @ points
+        # Combined Rz @ Ry @ Rx rotation
+        R_total = np.array([[cz*cy, cz*sy*sx - sz*cx, cz*sy*cx + sz*sx],
+                            [sz*cy, sz*sy*sx + cz*cx, sz*sy*cx - cz*sx],
+                            [-sy, cy*sx, cy*cx]], dtype=np.float32)
+        self._rotated_points = R_total @ self._local_points
+    
+    def _update_geometry(self):
+        """Update plane geometry"""
+        transformed = self._rotated_points + self._center[:, None]
         
         self._surface = (
             transformed[0].reshape(self._num_points, self._num_points),
@@ -218,7 +290,31 @@ class Plane:
             transformed[2].reshape(self._num_points, self._num_points)
         )
     
+    def _surface_polygons(self):
+        """Corners of the surface quads, shape (num_quads, 4, 3)"""
+        idx = np.ix_(self._surface_indices, self._surface_indices)
+        corners = np.stack([a[idx] for a in self._surface], axis=-1)
+        quads = np.stack([corners[:-1, :-1], corners[:-1, 1:],
+                          corners[1:, 1:], corners[1:, :-1]], axis=2)
+        return quads.reshape(-1, 4, 3)
+    
     def draw(self, ax, color='yellow', alpha=0.5):
-        """Draw plane"""
-        if self._surface is not None:
-            ax.plot_surface(*self._surface, color=color, alpha=alpha)
+        """Draw plane, moving the previously drawn surface if only the center changed"""
+        if self._surface is None:
+            return
+        
+        entry = self._surface_artists.get(ax)
+        if entry is not None:
+            artist, drawn_color, drawn_alpha, drawn_version = entry
+            if artist in ax.collections:
+                if (drawn_version == self._rotation_version and drawn_alpha == alpha and
+                        same_color(drawn_color, color)):
+                    # Shading and style still match, so just replace the polygon vertices
+                    artist.set_verts(self._surface_polygons())
+                    return
+                artist.remove()
+        
+        artist = ax.plot_surface(*self._surface, color=color, alpha=alpha,
+                                 rstride=self._surface_stride,
+                                 cstride=self._surface_stride)
+        self._surface_artists[ax] = (artist, color, alpha, self._rotation_version)
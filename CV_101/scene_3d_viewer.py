@@ -1,92 +1,39 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+from matplotlib.collections import LineCollection
 from matplotlib.widgets import Slider, Button
 
-class Camera:
-    def __init__(self, position=np.array([2, -4, 2]), up=np.array([0, 0, 1]), size=0.3):
-        self._position = position
-        self._up = up
-        self._size = size
-        self._direction = None
-        self._right = None
-        self._vertices = None
-        
-    @property
-    def position(self):
-        return self._position
-    
-    @position.setter
-    def position(self, value):
-        self._position = np.array(value)
-        self._update_camera()
-        
-    @property
-    def size(self):
-        return self._size
-    
-    @size.setter
-    def size(self, value):
-        self._size = value
-        self._update_camera()
-    
-    def look_at(self, target):
-        self._direction = target - self.position
-        self._direction = self._direction / np.linalg.norm(self._direction)
-        self._update_camera()
-    
-    def _update_camera(self):
-        if self._direction is None:
-            return
-            
-        self._right = np.cross(self._direction, self._up)
-        self._right = self._right / np.linalg.norm(self._right)
-        self._up = np.cross(self._right, self._direction)
-        self._up = self._up / np.linalg.norm(self._up)
-        
-        self._update_vertices()
-    
-    def _update_vertices(self):
-        self._vertices = np.array([
-            self.position,
-            self.position + self.size * (-self._right + self._direction - self._up),
-            self.position + self.size * (self._right + self._direction - self._up),
-            self.position + self.size * (self._right + self._direction + self._up),
-            self.position + self.size * (-self._right + self._direction + self._up)
-        ])
+from camera_nd_obj import HAVE_NUMBA, Camera, Cube, njit
 
-class Cube:
-    def __init__(self, origin=np.array([0, 0, 0]), size=1):
-        self._origin = np.array(origin)
-        self._size = size
-        self._vertices = None
-        self._edges = None
-        self._update_geometry()
-    
-    @property
-    def center(self):
-        return self._origin + self._size/2
+@njit(cache=True)
+def _project(position, direction, right, up, vertices, K):
+    """Project vertices into the view of a camera with the given position and frame"""
+    # Fold the camera matrix into the camera transform once:
+    # KR = K @ R with rotation columns [right, direction, up], Kt = -KR @ position
+    R = np.empty((3, 3), dtype=np.float32)
+    for k in range(3):
+        R[k, 0], R[k, 1], R[k, 2] = right[k], direction[k], up[k]
+    KR = np.empty((3, 3), dtype=np.float32)
+    Kt = np.empty(3, dtype=np.float32)
+    for i in range(3):
+        for j in range(3):
+            KR[i, j] = K[i, 0]*R[0, j] + K[i, 1]*R[1, j] + K[i, 2]*R[2, j]
+        Kt[i] = -(KR[i, 0]*position[0] + KR[i, 1]*position[1] + KR[i, 2]*position[2])
     
-    def _update_geometry(self):
-        o = self._origin
-        s = self._size
-        
-        self._vertices = np.array([
-            o + [0,0,0], o + [s,0,0], o + [0,s,0], o + [s,s,0],
-            o + [0,0,s], o + [s,0,s], o + [0,s,s], o + [s,s,s]
-        ])
-        
-        edge_indices = [
-            (0,1), (0,2), (0,4), (1,3), (1,5), (2,3),
-            (2,6), (4,5), (4,6), (7,3), (7,5), (7,6)
-        ]
-        
-        self._edges = []
-        for start_idx, end_idx in edge_indices:
-            self._edges.append([
-                self._vertices[start_idx],
-                self._vertices[end_idx]
-            ])
+    projected = np.empty((vertices.shape[0], 2), dtype=np.float32)
+    for i in range(vertices.shape[0]):
+        h0 = KR[0, 0]*vertices[i, 0] + KR[0, 1]*vertices[i, 1] + KR[0, 2]*vertices[i, 2] + Kt[0]
+        h1 = KR[1, 0]*vertices[i, 0] + KR[1, 1]*vertices[i, 1] + KR[1, 2]*vertices[i, 2] + Kt[1]
+        h2 = KR[2, 0]*vertices[i, 0] + KR[2, 1]*vertices[i, 1] + KR[2, 2]*vertices[i, 2] + Kt[2]
+        
+        # Perspective divide of the camera-space part only, so the principal
+        # point is not scaled when the depth is clamped
+        w = max(h2, 0.1)  # Avoid division by very small numbers
+        projected[i, 0] = (h0 - K[0, 2]*h2) / w + K[0, 2]
+        projected[i, 1] = (h1 - K[1, 2]*h2) / w + K[1, 2]
+    return projected
 
 class Scene3DViewer:
     def __init__(self):
@@ -106,6 +53,14 @@ class Scene3DViewer:
         # Set camera to look at cube
         self.camera.look_at(self.cube.center)
         
+        # Persistent artists, created by the first draw and updated afterwards
+        self._cube_scatter = None
+        self._cube_lines = None
+        self._camera_scatter = None
+        self._frustum_lines = None
+        self._proj_scatter = None
+        self._proj_lines = None
+        
         # Add sliders
         self.setup_sliders()
         
@@ -134,34 +89,50 @@ class Scene3DViewer:
         self.slider_elev = Slider(ax_elev, 'Elevation', -90, 90, valinit=20)
         self.slider_azim = Slider(ax_azim, 'Azimuth', 0, 360, valinit=45)
         
+        # Coalesce slider events during a drag: the first change starts a short
+        # single-shot timer, and when it fires the latest slider values are drawn
+        # with a single canvas redraw. The sliders must not redraw the canvas
+        # themselves on every event.
+        self._pending = False
+        self._redraw_timer = self.fig.canvas.new_timer(interval=30)
+        self._redraw_timer.single_shot = True
+        self._redraw_timer.add_callback(self._redraw)
+        
         # Update function for sliders
         def update(val):
-            self.camera.position = np.array([
-                self.slider_x.val,
-                self.slider_y.val,
-                self.slider_z.val
-            ])
-            self.camera.look_at(self.cube.center)
-            self.ax.view_init(elev=self.slider_elev.val, azim=self.slider_azim.val)
-            self.setup_plot()
-            self.fig.canvas.draw_idle()
+            if not self._pending:
+                self._pending = True
+                self._redraw_timer.start()
         
         # Register update function with sliders
-        self.slider_x.on_changed(update)
-        self.slider_y.on_changed(update)
-        self.slider_z.on_changed(update)
-        self.slider_elev.on_changed(update)
-        self.slider_azim.on_changed(update)
+        for slider in (self.slider_x, self.slider_y, self.slider_z,
+                       self.slider_elev, self.slider_azim):
+            slider.drawon = False
+            slider.on_changed(update)
         
-    def setup_plot(self):
-        # Clear both axes
-        self.ax.cla()
-        self.ax2.cla()
-        
-        # Draw in 3D subplot
-        self.draw_cube()
-        self.draw_camera()
+    def _redraw(self):
+        if not self._pending:
+            return
+        self._pending = False
+        
+        # Only re-aim and re-project the camera when its position moved
+        new_position = np.array([
+            self.slider_x.val,
+            self.slider_y.val,
+            self.slider_z.val
+        ], dtype=np.float32)
+        if not np.array_equal(new_position, self.camera._position):
+            self.camera.position = new_position
+            self.camera.look_at(self.cube.center)
+            self.update_plot()
         
+        self._update_view_only()
+    
+    def _update_view_only(self):
+        self.ax.view_init(elev=self.slider_elev.val, azim=self.slider_azim.val)
+        self.fig.canvas.draw_idle()
+    
+    def setup_plot(self):
         # Set labels and title for 3D plot
         self.ax.set_xlabel('X')
         self.ax.set_ylabel('Y')
@@ -174,51 +145,54 @@ class Scene3DViewer:
         self.ax.set_ylim(-scale, scale)
         self.ax.set_zlim(-scale, scale)
         
-        # Draw in 2D subplot (projected view)
-        self.draw_projected_view()
-        
         # Set labels and title for 2D plot
         self.ax2.set_xlabel('x')
         self.ax2.set_ylabel('y')
         self.ax2.set_title('Camera View (2D Projection)')
         self.ax2.grid(True)
         
+        # Set reasonable view limits for 2D projection
+        self.ax2.set_xlim(0, 640)  # Image width
+        self.ax2.set_ylim(480, 0)  # Image height (inverted for standard image coordinates)
+        
+        # The cube does not move, so its artists are drawn once here
+        self.draw_cube()
+        self.update_plot()
+    
+    def update_plot(self):
+        # Draw in 3D subplot
+        self.draw_camera()
+        
+        # Draw in 2D subplot (projected view)
+        self.draw_projected_view()
+        
     def draw_camera(self):
         vertices = self.camera._vertices
-        if vertices is not None:
-            # Draw edges from apex to base
-            for i in range(1, 5):
-                self.ax.plot([vertices[0][0], vertices[i][0]],
-                           [vertices[0][1], vertices[i][1]],
-                           [vertices[0][2], vertices[i][2]],
-                           'g-', linewidth=2)
-            
-            # Draw base
-            base_indices = [1, 2, 3, 4, 1]
-            x = [vertices[i][0] for i in base_indices]
-            y = [vertices[i][1] for i in base_indices]
-            z = [vertices[i][2] for i in base_indices]
-            self.ax.plot(x, y, z, 'g-', linewidth=2)
-            
-            # Draw camera position
-            self.ax.scatter([vertices[0][0]], [vertices[0][1]], [vertices[0][2]],
-                          color='g', s=100)
+        if self.camera._direction is not None:
+            segments = vertices[self.camera._edge_indices]
+            if self._frustum_lines is None:
+                # Draw edges from apex to base and the base
+                self._frustum_lines = Line3DCollection(segments, colors='g', linewidths=2)
+                self.ax.add_collection3d(self._frustum_lines)
+                
+                # Draw camera position
+                self._camera_scatter = self.ax.scatter([vertices[0][0]], [vertices[0][1]],
+                                                       [vertices[0][2]], color='g', s=100)
+            else:
+                self._frustum_lines.set_segments(segments)
+                self._camera_scatter._offsets3d = ([vertices[0][0]], [vertices[0][1]],
+                                                   [vertices[0][2]])
     
     def draw_cube(self):
         vertices = self.cube._vertices
-        edges = self.cube._edges
         
         # Draw vertices
-        self.ax.scatter(vertices[:, 0], vertices[:, 1], vertices[:, 2],
-                       color='b', s=50)
+        self._cube_scatter = self.ax.scatter(vertices[:, 0], vertices[:, 1], vertices[:, 2],
+                                             color='b', s=50)
         
-        # Draw edges
-        for edge in edges:
-            start, end = edge
-            self.ax.plot([start[0], end[0]],
-                        [start[1], end[1]],
-                        [start[2], end[2]],
-                        'r-', linewidth=2)
+        # Draw all edges as a single collection
+        self._cube_lines = Line3DCollection(self.cube._edge_segments, colors='r', linewidths=2)
+        self.ax.add_collection3d(self._cube_lines)
     
     def draw_projected_view(self):
         # Define camera parameters for projection
@@ -226,50 +200,46 @@ class Scene3DViewer:
             [800., 0., 320.],
             [0., 800., 240.],
             [0., 0., 1.]
-        ])
-        
-        # Get camera parameters
-        camera_right = self.camera._right
-        camera_up = self.camera._up
-        camera_dir = self.camera._direction
-        
-        # Create rotation matrix from camera orientation
-        rotation_matrix = np.column_stack([camera_right, np.cross(camera_up, camera_right), camera_up])
-        translation_vector = -rotation_matrix @ self.camera.position
+        ], dtype=np.float32)
         
-        # Project cube vertices
         vertices = self.cube._vertices
-        projected_points = []
-        for vertex in vertices:
-            # Apply camera transform
-            transformed = rotation_matrix @ vertex + translation_vector
+        if HAVE_NUMBA:
+            # Camera transform and projection in one compiled kernel
+            projected_points = _project(
+                self.camera._position, self.camera._direction,
+                self.camera._right, self.camera._up,
+                vertices, camera_matrix)
+        else:
+            # Create rotation matrix from camera orientation
+            rotation_matrix = np.column_stack([self.camera._right, self.camera._direction,
+                                               self.camera._up])
+            translation_vector = -rotation_matrix @ self.camera.position
             
-            # Project to 2D (using homogeneous coordinates)
-            z = transformed[2]
-            if z < 0.1:  # Avoid division by very small numbers
-                z = 0.1
-            x = transformed[0] / z
-            y = transformed[1] / z
+            # Fold the camera matrix into the camera transform once
+            KR = camera_matrix @ rotation_matrix
+            Kt = camera_matrix @ translation_vector
             
-            # Apply camera matrix
-            projected = camera_matrix @ np.array([x, y, 1.0])
-            projected_points.append(projected[:2])  # Only keep x, y coordinates
-        
-        projected_points = np.array(projected_points)
-        
-        # Set reasonable view limits for 2D projection
-        self.ax2.set_xlim(0, 640)  # Image width
-        self.ax2.set_ylim(480, 0)  # Image height (inverted for standard image coordinates)
-        
-        # Draw projected points
-        self.ax2.scatter(projected_points[:, 0], projected_points[:, 1], c='b')
-        
-        # Draw projected edges
-        for edge in self.cube._edges:
-            start_idx = np.where(np.all(vertices == edge[0], axis=1))[0][0]
-            end_idx = np.where(np.all(vertices == edge[1], axis=1))[0][0]
-            self.ax2.plot([projected_points[start_idx, 0], projected_points[end_idx, 0]],
-                         [projected_points[start_idx, 1], projected_points[end_idx, 1]], 'r-')
+            # Project cube vertices (homogeneous image coordinates for all vertices at once)
+            h = np.einsum('ij,kj->ki', KR, vertices) + Kt
+            
+            # Perspective divide of the camera-space part only, so the principal
+            # point is not scaled when the depth is clamped
+            w = np.maximum(h[:, 2:3], 0.1)  # Avoid division by very small numbers
+            principal = camera_matrix[:2, 2]
+            projected_points = (h[:, :2] - principal * h[:, 2:3]) / w + principal
+        
+        segments = projected_points[self.cube._edge_indices]
+        if self._proj_scatter is None:
+            # Draw projected points
+            self._proj_scatter = self.ax2.scatter(projected_points[:, 0], projected_points[:, 1],
+                                                  c='b')
+            
+            # Draw projected edges, looked up by the cube's edge indices
+            self._proj_lines = LineCollection(segments, colors='r')
+            self.ax2.add_collection(self._proj_lines)
+        else:
+            self._proj_scatter.set_offsets(projected_points)
+            self._proj_lines.set_segments(segments)
 
 def main():
     viewer = Scene3DViewer()